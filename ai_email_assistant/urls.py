@@ -9,7 +9,10 @@ def home_view(request):
         'endpoints': {
             'Admin Panel': '/admin/',
             'Email List': '/api/emails/',
+            'Email Detail': '/api/emails/<id>/',
             'Dashboard Stats': '/api/stats/',
+            'Response Times': '/api/response-times/',
+            'Export Emails': '/api/export/',
             'Process Sample Data': '/api/process-sample/',
             'Update Email Status': '/api/update-status/'
         },
@@ -21,7 +24,11 @@ def api_index(request):
         'api_name': 'AI Email Assistant API',
         'available_endpoints': [
             {'url': '/api/emails/', 'method': 'GET', 'description': 'Get all processed emails'},
+            {'url': '/api/emails/<id>/', 'method': 'GET', 'description': 'Get one email, including archived ones'},
             {'url': '/api/stats/', 'method': 'GET', 'description': 'Get dashboard analytics'},
+            {'url': '/api/response-times/', 'method': 'GET', 'description': 'Get time-to-response percentiles by priority'},
+            {'url': '/api/export/', 'method': 'GET', 'description': 'Stream all emails as CSV or NDJSON'},
+            {'url': '/api/async/export/', 'method': 'GET', 'description': 'Stream all emails as CSV or NDJSON (ASGI)'},
             {'url': '/api/process-sample/', 'method': 'POST', 'description': 'Process sample CSV data'},
             {'url': '/api/update-status/', 'method': 'POST', 'description': 'Update email status'}
         ]
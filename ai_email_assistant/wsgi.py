@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ai_email_assistant.settings')
 
 application = get_wsgi_application()
+
+# Opt-in (REPLY_RETRIEVAL_WARM_ON_STARTUP): build the reply-suggestion index at boot
+from email_manager.services import warm_reply_index
+
+warm_reply_index()
@@ -0,0 +1,54 @@
+import argparse
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+def fetch(url):
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=60) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return status, time.perf_counter() - start
+
+def run_load(url, clients, requests_per_client):
+    """Hit one endpoint from `clients` concurrent connections and report throughput and latency"""
+    total = clients * requests_per_client
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(fetch, [url] * total))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for _, latency in results)
+    errors = sum(1 for status, _ in results if status != 200)
+    return {
+        'rps': total / elapsed,
+        'p50': latencies[len(latencies) // 2],
+        'p99': latencies[max(0, int(len(latencies) * 0.99) - 1)],
+        'errors': errors
+    }
+
+def benchmark_dashboard():
+    """Compare sync and async dashboard views on a running ASGI server, e.g.
+    uvicorn ai_email_assistant.asgi:application --workers 1
+    """
+    parser = argparse.ArgumentParser(description=benchmark_dashboard.__doc__)
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000/api')
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=5, help='Requests per client')
+    args = parser.parse_args()
+
+    print(f"🔄 Benchmarking dashboard with {args.clients} concurrent clients...")
+    for name, path in (('sync', '/stats/'), ('async', '/async/stats/')):
+        fetch(args.base_url + path)  # warm up
+        result = run_load(args.base_url + path, args.clients, args.requests)
+        print(
+            f"{name:>5}: {result['rps']:.0f} req/s, p50 {result['p50'] * 1000:.1f} ms, "
+            f"p99 {result['p99'] * 1000:.1f} ms, errors {result['errors']}"
+        )
+
+if __name__ == "__main__":
+    benchmark_dashboard()
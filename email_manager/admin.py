@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Email, EmailAnalytics
+from .models import ArchivedEmail, Email, EmailAnalytics
 
 @admin.register(Email)
 class EmailAdmin(admin.ModelAdmin):
@@ -13,3 +13,10 @@ class EmailAdmin(admin.ModelAdmin):
 class EmailAnalyticsAdmin(admin.ModelAdmin):
     list_display = ['date', 'total_emails', 'urgent_emails', 'resolved_emails']
     list_filter = ['date']
+
+@admin.register(ArchivedEmail)
+class ArchivedEmailAdmin(admin.ModelAdmin):
+    list_display = ['sender', 'subject', 'priority', 'created_at', 'archived_at']
+    list_filter = ['priority', 'archived_at']
+    search_fields = ['sender', 'subject']
+    exclude = ArchivedEmail.COMPRESSED_FIELDS
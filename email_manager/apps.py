@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class EmailManagerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'email_manager'
+
+    def ready(self):
+        from .db import configure_sqlite
+        from .middleware import install_query_recorder
+        connection_created.connect(configure_sqlite, dispatch_uid='email_manager.configure_sqlite')
+        connection_created.connect(install_query_recorder, dispatch_uid='email_manager.install_query_recorder')
@@ -0,0 +1,73 @@
+import zlib
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import ArchivedEmail, Email
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# One-byte codec tag in front of every compressed blob so either codec can be read back
+ZLIB = b'z'
+ZSTD = b's'
+
+
+def compress_text(text):
+    data = (text or '').encode('utf-8')
+    if zstandard is not None:
+        return ZSTD + zstandard.ZstdCompressor(level=9).compress(data)
+    return ZLIB + zlib.compress(data, 9)
+
+
+def decompress_text(blob):
+    blob = bytes(blob or b'')
+    if not blob:
+        return ''
+    codec, payload = blob[:1], blob[1:]
+    if codec == ZSTD:
+        if zstandard is None:
+            raise RuntimeError('zstandard is required to read this archived email')
+        return zstandard.ZstdDecompressor().decompress(payload).decode('utf-8')
+    return zlib.decompress(payload).decode('utf-8')
+
+
+def archive_resolved_emails(days=30, batch_size=500, max_batches=None):
+    """Move emails resolved more than `days` ago into the archive, one bounded batch per transaction"""
+    cutoff = timezone.now() - timedelta(days=days)
+    candidates = Email.objects.filter(status='resolved', resolved_at__lt=cutoff).order_by('id')
+
+    archived_count = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        with transaction.atomic():
+            emails = list(candidates[:batch_size])
+            if not emails:
+                break
+            ArchivedEmail.objects.bulk_create([ArchivedEmail.from_email(email) for email in emails])
+            Email.objects.filter(id__in=[email.id for email in emails]).delete()
+        archived_count += len(emails)
+        batches += 1
+    return archived_count
+
+
+def vacuum_database():
+    """Return freed pages to the filesystem (SQLite keeps them in the file otherwise)"""
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute('VACUUM')
+
+
+def get_email(email_id):
+    """Look up an email in the hot table, falling back to the archive"""
+    try:
+        return Email.objects.get(id=email_id)
+    except Email.DoesNotExist:
+        pass
+    try:
+        return ArchivedEmail.objects.get(id=email_id).to_email()
+    except ArchivedEmail.DoesNotExist:
+        raise Email.DoesNotExist(f"Email {email_id} not found")
@@ -0,0 +1,118 @@
+import re
+import zlib
+
+import numpy as np
+from scipy import sparse
+
+TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+class HashingVectorizer:
+    """Turn texts into a sparse term-count matrix using hashed unigrams and bigrams"""
+    def __init__(self, n_features=2 ** 17):
+        self.n_features = n_features
+        self._cache = {}
+
+    def _index(self, token):
+        index = self._cache.get(token)
+        if index is None:
+            # crc32 is stable across processes, unlike the builtin hash()
+            index = zlib.crc32(token.encode('utf-8')) % self.n_features
+            if len(self._cache) < 500000:
+                self._cache[token] = index
+        return index
+
+    def transform(self, texts):
+        indices = []
+        indptr = [0]
+        for text in texts:
+            tokens = TOKEN_RE.findall((text or '').lower())
+            terms = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            indices.extend(self._index(term) for term in terms)
+            indptr.append(len(indices))
+
+        indices = np.asarray(indices, dtype=np.int32)
+        data = np.ones(len(indices), dtype=np.float32)
+        matrix = sparse.csr_matrix(
+            (data, indices, np.asarray(indptr, dtype=np.int64)),
+            shape=(len(indptr) - 1, self.n_features)
+        )
+        matrix.sum_duplicates()
+        return matrix
+
+
+class NaiveBayesHead:
+    """Multinomial Naive Bayes over hashed features for a single label"""
+    def __init__(self, alpha=1.0):
+        self.alpha = alpha
+        self.classes = None
+        self.feature_log_prob = None
+        self.class_log_prior = None
+
+    def fit(self, X, labels):
+        self.classes, y = np.unique(np.asarray(labels), return_inverse=True)
+        one_hot = sparse.csr_matrix(
+            (np.ones(len(y), dtype=np.float64), (y, np.arange(len(y)))),
+            shape=(len(self.classes), len(y))
+        )
+        feature_counts = np.asarray((one_hot @ X).todense()) + self.alpha
+        self.feature_log_prob = (
+            np.log(feature_counts) - np.log(feature_counts.sum(axis=1, keepdims=True))
+        ).astype(np.float32)
+        class_counts = np.bincount(y, minlength=len(self.classes))
+        self.class_log_prior = np.log(class_counts / class_counts.sum()).astype(np.float32)
+        return self
+
+    def predict(self, X):
+        scores = X @ self.feature_log_prob.T + self.class_log_prior
+        return self.classes[np.asarray(scores).argmax(axis=1)]
+
+
+class EmailClassifier:
+    """Local batched sentiment and priority classifier, an alternative to the keyword heuristics"""
+    def __init__(self, n_features=2 ** 17, alpha=1.0):
+        self.vectorizer = HashingVectorizer(n_features)
+        self.sentiment = NaiveBayesHead(alpha)
+        self.priority = NaiveBayesHead(alpha)
+
+    @staticmethod
+    def email_text(subject, body):
+        return f"{subject or ''} {body or ''}"
+
+    def fit(self, texts, sentiments, priorities):
+        X = self.vectorizer.transform(texts)
+        self.sentiment.fit(X, sentiments)
+        self.priority.fit(X, priorities)
+        return self
+
+    def predict(self, texts):
+        """Return a list of (sentiment, priority) tuples, one per text"""
+        if not texts:
+            return []
+        X = self.vectorizer.transform(texts)
+        return list(zip(self.sentiment.predict(X).tolist(), self.priority.predict(X).tolist()))
+
+    def save(self, path):
+        with open(path, 'wb') as fh:
+            np.savez_compressed(
+                fh,
+                n_features=np.array(self.vectorizer.n_features),
+                alpha=np.array(self.sentiment.alpha),
+                sentiment_classes=self.sentiment.classes,
+                sentiment_log_prob=self.sentiment.feature_log_prob,
+                sentiment_log_prior=self.sentiment.class_log_prior,
+                priority_classes=self.priority.classes,
+                priority_log_prob=self.priority.feature_log_prob,
+                priority_log_prior=self.priority.class_log_prior,
+            )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            model = cls(int(data['n_features']), float(data['alpha']))
+            for name in ('sentiment', 'priority'):
+                head = getattr(model, name)
+                head.classes = data[f'{name}_classes']
+                head.feature_log_prob = data[f'{name}_log_prob']
+                head.class_log_prior = data[f'{name}_log_prior']
+        return model
@@ -4,6 +4,7 @@ from email.mime.multipart import MIMEMultipart
 from django.core.mail import send_mail, EmailMessage
 from django.conf import settings
 import logging
+from .scheduler import schedule
 
 logger = logging.getLogger(__name__)
 
@@ -72,6 +73,14 @@ Original Message:
         sent_count = 0
         failed_count = 0
         
+        # Dispatch urgent/negative mail first; oldest first within a class
+        email_list = schedule(
+            email_list,
+            priority=lambda email_data: email_data.get('priority'),
+            sentiment=lambda email_data: email_data.get('sentiment'),
+            received_at=lambda email_data: email_data.get('sent_date')
+        )
+        
         print(f"\n📧 PROCESSING {len(email_list)} EMAILS FOR BULK SEND:")
         
         for i, email_data in enumerate(email_list, 1):
@@ -0,0 +1,117 @@
+import csv
+import json
+from datetime import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import ArchivedEmail, Email
+
+EXPORT_FIELDS = [
+    'id', 'sender', 'subject', 'body', 'sent_date', 'sentiment', 'priority', 'contact_info',
+    'request_summary', 'ai_response', 'status', 'responded_at', 'resolved_at', 'created_at', 'updated_at'
+]
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class Echo:
+    """File-like object whose write() hands the value back, so csv.writer can feed a generator"""
+    def write(self, value):
+        return value
+
+
+def parse_when(value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid date: {value}")
+        parsed = datetime.combine(day, datetime.min.time())
+    return parsed
+
+
+def filter_emails(queryset, params):
+    """Apply export filters (status, priority, sentiment, sender, since, until) from a dict-like"""
+    for field in ('status', 'priority', 'sentiment', 'sender'):
+        if params.get(field):
+            queryset = queryset.filter(**{field: params[field]})
+    if params.get('since'):
+        queryset = queryset.filter(created_at__gte=parse_when(params['since']))
+    if params.get('until'):
+        queryset = queryset.filter(created_at__lt=parse_when(params['until']))
+    return queryset
+
+
+def iter_emails(params, include_archived=False, chunk_size=2000):
+    """Return a generator of matching emails, read chunk_size rows at a time.
+
+    Hot emails come first in id order, followed by archived ones (also in id
+    order) when include_archived is set. Filters are validated here, before
+    any rows are streamed.
+    """
+    hot = filter_emails(Email.objects.order_by('id'), params)
+    archived = filter_emails(ArchivedEmail.objects.order_by('id'), params) if include_archived else None
+
+    def emails():
+        yield from hot.iterator(chunk_size=chunk_size)
+        if archived is not None:
+            for email in archived.iterator(chunk_size=chunk_size):
+                yield email.to_email()
+
+    return emails()
+
+
+def aiter_emails(params, include_archived=False, chunk_size=2000):
+    """Async counterpart of iter_emails for ASGI, reading through aiterator()"""
+    hot = filter_emails(Email.objects.order_by('id'), params)
+    archived = filter_emails(ArchivedEmail.objects.order_by('id'), params) if include_archived else None
+
+    async def emails():
+        async for email in hot.aiterator(chunk_size=chunk_size):
+            yield email
+        if archived is not None:
+            async for email in archived.aiterator(chunk_size=chunk_size):
+                yield email.to_email()
+
+    return emails()
+
+
+def email_row(email):
+    row = {}
+    for field in EXPORT_FIELDS:
+        value = getattr(email, field)
+        row[field] = value.isoformat() if isinstance(value, datetime) else value
+    return row
+
+
+def ndjson_line(email):
+    return json.dumps(email_row(email), cls=DjangoJSONEncoder) + '\n'
+
+
+def export_lines(emails, fmt='csv'):
+    """Yield the export one line at a time"""
+    if fmt == 'ndjson':
+        for email in emails:
+            yield ndjson_line(email)
+        return
+
+    writer = csv.DictWriter(Echo(), fieldnames=EXPORT_FIELDS)
+    yield writer.writeheader()
+    for email in emails:
+        yield writer.writerow(email_row(email))
+
+
+async def aexport_lines(emails, fmt='csv'):
+    """Async counterpart of export_lines for an async iterable of emails"""
+    if fmt == 'ndjson':
+        async for email in emails:
+            yield ndjson_line(email)
+        return
+
+    writer = csv.DictWriter(Echo(), fieldnames=EXPORT_FIELDS)
+    yield writer.writeheader()
+    async for email in emails:
+        yield writer.writerow(email_row(email))
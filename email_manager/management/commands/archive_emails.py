@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from email_manager.archive import archive_resolved_emails, vacuum_database
+
+
+class Command(BaseCommand):
+    help = 'Move emails resolved more than N days ago into the compressed archive (run from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help='Archive emails resolved more than this many days ago')
+        parser.add_argument('--batch-size', type=int, default=500, help='Emails moved per transaction')
+        parser.add_argument('--max-batches', type=int, default=None, help='Stop after this many batches')
+        parser.add_argument('--vacuum', action='store_true', help='Reclaim freed disk space afterwards (SQLite)')
+
+    def handle(self, *args, **options):
+        archived = archive_resolved_emails(
+            days=options['days'],
+            batch_size=options['batch_size'],
+            max_batches=options['max_batches'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} resolved emails"))
+
+        if options['vacuum'] and archived:
+            vacuum_database()
+            self.stdout.write("Vacuumed database")
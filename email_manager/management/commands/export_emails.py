@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from email_manager.export import FORMATS, export_lines, iter_emails
+
+
+class Command(BaseCommand):
+    help = 'Stream all emails (optionally filtered) to CSV or NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--output', default='-', help='File to write, or - for stdout')
+        parser.add_argument('--status')
+        parser.add_argument('--priority')
+        parser.add_argument('--sentiment')
+        parser.add_argument('--sender')
+        parser.add_argument('--since', help='Only emails created on or after this date/datetime')
+        parser.add_argument('--until', help='Only emails created before this date/datetime')
+        parser.add_argument('--include-archived', action='store_true', help='Also export archived emails')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        try:
+            emails = iter_emails(options, options['include_archived'], options['chunk_size'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        lines = export_lines(emails, options['format'])
+        if options['output'] == '-':
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+
+        with open(options['output'], 'w', newline='', encoding='utf-8') as out:
+            for line in lines:
+                out.write(line)
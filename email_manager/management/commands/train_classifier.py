@@ -0,0 +1,81 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from email_manager.classifier import EmailClassifier
+from email_manager.models import Email
+from email_manager.services import EmailProcessor, classifier_model_path
+
+
+class Command(BaseCommand):
+    help = 'Train the local sentiment/priority classifier from labeled emails and save it to disk'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=None, help='Model path (defaults to EMAIL_CLASSIFIER_PATH)')
+        parser.add_argument('--test-size', type=float, default=0.2, help='Fraction of emails held out for evaluation')
+        parser.add_argument('--n-features', type=int, default=2 ** 17, help='Size of the hashed feature space')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument(
+            '--benchmark-size', type=int, default=10000,
+            help='Minimum number of emails to classify when measuring throughput'
+        )
+
+    def handle(self, *args, **options):
+        rows = list(Email.objects.values_list('subject', 'body', 'sentiment', 'priority'))
+        if len(rows) < 2:
+            raise CommandError('Need at least 2 labeled emails to train the classifier')
+
+        random.Random(options['seed']).shuffle(rows)
+        n_test = min(max(1, int(len(rows) * options['test_size'])), len(rows) - 1)
+        train, test = rows[n_test:], rows[:n_test]
+
+        model = EmailClassifier(n_features=options['n_features'])
+        model.fit(
+            [EmailClassifier.email_text(subject, body) for subject, body, _, _ in train],
+            [row[2] for row in train],
+            [row[3] for row in train],
+        )
+
+        # Evaluate the model against the keyword heuristics on the held-out emails
+        heuristics = EmailProcessor()
+        texts = [EmailClassifier.email_text(subject, body) for subject, body, _, _ in test]
+        bodies = [body for _, body, _, _ in test]
+        model_labels = model.predict(texts)
+        heuristic_labels = [(heuristics.analyze_sentiment(body), heuristics.determine_priority(body)) for body in bodies]
+
+        # Time both on the same fixed-size batch; the held-out split alone is too small to measure
+        repeats = max(1, -(-options['benchmark_size'] // len(test)))
+        start = time.perf_counter()
+        model.predict(texts * repeats)
+        model_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for body in bodies * repeats:
+            heuristics.analyze_sentiment(body)
+            heuristics.determine_priority(body)
+        heuristic_time = time.perf_counter() - start
+
+        self.stdout.write(f"Trained on {len(train)} emails, evaluated on {len(test)}")
+        self.stdout.write(f"Throughput measured on a batch of {len(test) * repeats:,} emails")
+        for name, labels, elapsed in (
+            ('Local model', model_labels, model_time),
+            ('Heuristics', heuristic_labels, heuristic_time),
+        ):
+            sentiment_acc = sum(p[0] == row[2] for p, row in zip(labels, test)) / len(test)
+            priority_acc = sum(p[1] == row[3] for p, row in zip(labels, test)) / len(test)
+            rate = len(test) * repeats / elapsed if elapsed else float('inf')
+            self.stdout.write(
+                f"{name}: sentiment accuracy {sentiment_acc:.1%}, "
+                f"priority accuracy {priority_acc:.1%}, {rate:,.0f} emails/sec"
+            )
+
+        # Refit on every labeled email before saving
+        model.fit(
+            [EmailClassifier.email_text(subject, body) for subject, body, _, _ in rows],
+            [row[2] for row in rows],
+            [row[3] for row in rows],
+        )
+        output = options['output'] or classifier_model_path()
+        model.save(output)
+        self.stdout.write(self.style.SUCCESS(f"Saved classifier to {output}"))
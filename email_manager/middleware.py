@@ -0,0 +1,179 @@
+import cProfile
+import json
+import logging
+import os
+import random
+import re
+import time
+import uuid
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('email_manager.profiling')
+
+PROFILE_HEADER = 'HTTP_X_PROFILE_REQUEST'
+
+
+# Recorder for the request being handled; a context variable so concurrent
+# ASGI requests sharing a connection each see only their own queries
+current_recorder = ContextVar('email_manager_query_recorder', default=None)
+
+
+class QueryRecorder:
+    """Collects (duration, sql) for the queries of one request"""
+    def __init__(self):
+        self.queries = []
+
+    @property
+    def total_time(self):
+        return sum(duration for duration, _ in self.queries)
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper that times every query into the current request's recorder"""
+    recorder = current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        recorder.queries.append((time.perf_counter() - start, sql))
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """Add record_query to a connection once (connection_created handler)"""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class RequestProfilingMiddleware:
+    """Records wall time, query count/time and slowest queries for every request.
+
+    Results go to a Server-Timing header and a JSON line on the
+    'email_manager.profiling' logger. Queries run while a streaming response is
+    being consumed are not counted. Requests can also be captured with
+    pyinstrument (or cProfile) into PROFILING_DIR, either when they send an
+    X-Profile-Request header (PROFILING_HEADER_ENABLED, defaults to DEBUG) or at
+    random with PROFILING_SAMPLE_RATE. Async requests need pyinstrument; without
+    it their captures are skipped with a warning.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_query_count = getattr(settings, 'PROFILING_SLOW_QUERY_COUNT', 3)
+        self.sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0)
+        self.header_enabled = getattr(settings, 'PROFILING_HEADER_ENABLED', settings.DEBUG)
+        self.profile_dir = getattr(
+            settings, 'PROFILING_DIR', os.path.join(getattr(settings, 'BASE_DIR', '.'), 'profiles')
+        )
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        for connection in connections.all():
+            install_query_recorder(None, connection)
+
+        recorder = QueryRecorder()
+        token = current_recorder.set(recorder)
+        profiler = self.start_profiler(request)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            profile_path = self.stop_profiler(profiler, request)
+            current_recorder.reset(token)
+        return self.finish(request, response, time.perf_counter() - start, recorder, profile_path)
+
+    async def __acall__(self, request):
+        # Queries run on executor threads whose connections got record_query when they
+        # were created; the context variable is copied along with each sync_to_async call
+        recorder = QueryRecorder()
+        token = current_recorder.set(recorder)
+        profiler = self.start_profiler(request, async_mode=True)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            profile_path = self.stop_profiler(profiler, request)
+            current_recorder.reset(token)
+        return self.finish(request, response, time.perf_counter() - start, recorder, profile_path)
+
+    def finish(self, request, response, wall_time, recorder, profile_path=None):
+        db_time = recorder.total_time
+        response['Server-Timing'] = (
+            f'total;dur={wall_time * 1000:.1f}, '
+            f'db;dur={db_time * 1000:.1f};desc="{len(recorder.queries)} queries"'
+        )
+
+        slowest = sorted(recorder.queries, key=lambda query: query[0], reverse=True)[:self.slow_query_count]
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'wall_ms': round(wall_time * 1000, 2),
+            'db_queries': len(recorder.queries),
+            'db_ms': round(db_time * 1000, 2),
+            'slowest_queries': [
+                {'ms': round(duration * 1000, 2), 'sql': sql} for duration, sql in slowest
+            ],
+        }
+        if profile_path:
+            record['profile'] = profile_path
+        logger.info(json.dumps(record))
+        return response
+
+    def should_profile(self, request):
+        if self.header_enabled and request.META.get(PROFILE_HEADER):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def start_profiler(self, request, async_mode=False):
+        if not self.should_profile(request):
+            return None
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            if async_mode:
+                # cProfile follows the thread, not the task, so it cannot isolate one async request
+                logger.warning('Skipping profile capture of %s %s: async requests need pyinstrument',
+                               request.method, request.path)
+                return None
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                logger.warning('Skipping profile capture of %s %s: another request is being profiled',
+                               request.method, request.path)
+                return None
+        else:
+            profiler = Profiler(async_mode='enabled') if async_mode else Profiler()
+            profiler.start()
+        return profiler
+
+    def stop_profiler(self, profiler, request):
+        if profiler is None:
+            return None
+
+        os.makedirs(self.profile_dir, exist_ok=True)
+        slug = re.sub(r'[^A-Za-z0-9]+', '-', request.path).strip('-') or 'root'
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{request.method}-{slug}-{uuid.uuid4().hex[:8]}"
+
+        if isinstance(profiler, cProfile.Profile):
+            profiler.disable()
+            path = os.path.join(self.profile_dir, f'{name}.prof')
+            profiler.dump_stats(path)
+        else:
+            profiler.stop()
+            path = os.path.join(self.profile_dir, f'{name}.html')
+            with open(path, 'w', encoding='utf-8') as fh:
+                fh.write(profiler.output_html())
+        return path
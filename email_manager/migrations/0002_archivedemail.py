@@ -0,0 +1,36 @@
+# Generated by Django 4.2 on 2026-10-19 12:22
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('email_manager', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedEmail',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('sender', models.EmailField(max_length=254)),
+                ('subject', models.CharField(max_length=500)),
+                ('sent_date', models.DateTimeField()),
+                ('sentiment', models.CharField(choices=[('Positive', 'Positive'), ('Negative', 'Negative'), ('Neutral', 'Neutral')], default='Neutral', max_length=20)),
+                ('priority', models.CharField(choices=[('Urgent', 'Urgent'), ('Not urgent', 'Not urgent')], default='Not urgent', max_length=20)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('responded', 'Responded'), ('resolved', 'Resolved')], default='resolved', max_length=20)),
+                ('body', models.BinaryField()),
+                ('contact_info', models.BinaryField()),
+                ('request_summary', models.BinaryField()),
+                ('ai_response', models.BinaryField()),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
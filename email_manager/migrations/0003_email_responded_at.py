@@ -0,0 +1,23 @@
+# Generated by Django 4.2 on 2026-10-19 12:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('email_manager', '0002_archivedemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedemail',
+            name='responded_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='email',
+            name='responded_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
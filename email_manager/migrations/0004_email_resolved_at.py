@@ -0,0 +1,32 @@
+# Generated by Django 4.2 on 2026-10-19 12:33
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_resolved_at(apps, schema_editor):
+    # Best available estimate for rows resolved before the field existed
+    for model_name in ('Email', 'ArchivedEmail'):
+        model = apps.get_model('email_manager', model_name)
+        model.objects.filter(status='resolved', resolved_at__isnull=True).update(resolved_at=F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('email_manager', '0003_email_responded_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedemail',
+            name='resolved_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='email',
+            name='resolved_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_resolved_at, migrations.RunPython.noop),
+    ]
@@ -29,6 +29,8 @@ class Email(models.Model):
     request_summary = models.TextField(blank=True)
     ai_response = models.TextField(blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    responded_at = models.DateTimeField(null=True, blank=True)
+    resolved_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -37,6 +39,19 @@ class Email(models.Model):
         
     def __str__(self):
         return f"{self.sender} - {self.subject[:50]}"
+    
+    def save(self, *args, **kwargs):
+        # resolved_at follows status: stamped on resolution, cleared whenever the
+        # email leaves 'resolved'. Bulk update() calls must clear it themselves.
+        if self.status == 'resolved':
+            if self.resolved_at is None:
+                self.resolved_at = timezone.now()
+        else:
+            self.resolved_at = None
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'status' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'resolved_at'}
+        super().save(*args, **kwargs)
 
 class EmailAnalytics(models.Model):
     date = models.DateField(default=timezone.now)
@@ -52,3 +67,49 @@ class EmailAnalytics(models.Model):
         
     def __str__(self):
         return f"Analytics for {self.date}"
+
+class ArchivedEmail(models.Model):
+    """Cold storage for long-resolved emails; text fields are stored compressed"""
+    id = models.BigIntegerField(primary_key=True)
+    sender = models.EmailField()
+    subject = models.CharField(max_length=500)
+    sent_date = models.DateTimeField()
+    sentiment = models.CharField(max_length=20, choices=Email.SENTIMENT_CHOICES, default='Neutral')
+    priority = models.CharField(max_length=20, choices=Email.PRIORITY_CHOICES, default='Not urgent')
+    status = models.CharField(max_length=20, choices=Email.STATUS_CHOICES, default='resolved')
+    body = models.BinaryField()
+    contact_info = models.BinaryField()
+    request_summary = models.BinaryField()
+    ai_response = models.BinaryField()
+    responded_at = models.DateTimeField(null=True, blank=True)
+    resolved_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+    
+    COMPRESSED_FIELDS = ['body', 'contact_info', 'request_summary', 'ai_response']
+    PLAIN_FIELDS = ['id', 'sender', 'subject', 'sent_date', 'sentiment', 'priority', 'status', 'responded_at', 'resolved_at', 'created_at', 'updated_at']
+    
+    class Meta:
+        ordering = ['-created_at']
+        
+    def __str__(self):
+        return f"[archived] {self.sender} - {self.subject[:50]}"
+    
+    @classmethod
+    def from_email(cls, email):
+        from .archive import compress_text
+        
+        archived = cls(**{field: getattr(email, field) for field in cls.PLAIN_FIELDS})
+        for field in cls.COMPRESSED_FIELDS:
+            setattr(archived, field, compress_text(getattr(email, field)))
+        return archived
+    
+    def to_email(self):
+        """Rebuild an (unsaved) Email with the text fields decompressed"""
+        from .archive import decompress_text
+        
+        email = Email(**{field: getattr(self, field) for field in self.PLAIN_FIELDS})
+        for field in self.COMPRESSED_FIELDS:
+            setattr(email, field, decompress_text(getattr(self, field)))
+        return email
@@ -0,0 +1,149 @@
+import threading
+from datetime import timedelta
+
+import numpy as np
+from scipy import sparse
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from .classifier import HashingVectorizer
+from .models import ArchivedEmail, Email
+
+
+def normalize_rows(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms) @ matrix
+
+
+class ResolvedTicketIndex:
+    """TF-IDF index over resolved tickets, kept in a SciPy sparse matrix and grown incrementally"""
+    def __init__(self, n_features=2 ** 18):
+        self.vectorizer = HashingVectorizer(n_features)
+        self.ids = []
+        self.subjects = []
+        self.responses = []
+        self.doc_freq = np.zeros(n_features, dtype=np.int64)
+        self.refreshed_at = None
+        self._indexed = set()
+        self._blocks = []
+        self._weighted = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def term_frequencies(self, texts):
+        tf = self.vectorizer.transform(texts)
+        tf.data = 1 + np.log(tf.data)
+        return tf
+
+    def add(self, tickets):
+        """Index (id, subject, body, ai_response) tuples; already indexed ids are skipped.
+
+        The IDF-weighted matrix is rebuilt here, on the refresh thread, so
+        search() never pays for it on the request path.
+        """
+        with self._lock:
+            new = [t for t in tickets if t[0] not in self._indexed and t[3]]
+            if not new:
+                return 0
+            tf = self.term_frequencies([f"{subject} {body}" for _, subject, body, _ in new])
+            self.doc_freq += np.bincount(tf.indices, minlength=self.vectorizer.n_features)
+            self._blocks.append(tf)
+            for ticket_id, subject, _, response in new:
+                self._indexed.add(ticket_id)
+                self.ids.append(ticket_id)
+                self.subjects.append(subject)
+                self.responses.append(response)
+            # IDF weights changed; searches keep using the previous matrix until this swap
+            self._weighted = self._build_weighted()
+            return len(new)
+
+    def _build_weighted(self):
+        if len(self._blocks) > 1:
+            self._blocks = [sparse.vstack(self._blocks, format='csr')]
+        idf = sparse.diags((np.log((1 + len(self.ids)) / (1 + self.doc_freq)) + 1).astype(np.float32))
+        return normalize_rows(self._blocks[0] @ idf).tocsr(), idf
+
+    def search(self, text, k=5):
+        """Return up to k most similar resolved tickets as dicts, best first"""
+        weighted = self._weighted
+        if weighted is None:
+            return []
+        matrix, idf = weighted
+        query = normalize_rows(self.term_frequencies([text]) @ idf)
+        scores = np.asarray((matrix @ query.T).todense()).ravel()
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            {
+                'id': self.ids[i],
+                'subject': self.subjects[i],
+                'ai_response': self.responses[i],
+                'score': float(scores[i]),
+            }
+            for i in top if scores[i] > 0
+        ]
+
+    def refresh(self):
+        """Index tickets resolved since the last refresh"""
+        now = timezone.now()
+        added = self.add(load_resolved_tickets(since=self.refreshed_at))
+        self.refreshed_at = now
+        return added
+
+    def needs_refresh(self):
+        interval = timedelta(seconds=getattr(settings, 'REPLY_RETRIEVAL_REFRESH_SECONDS', 60))
+        return self.refreshed_at is None or timezone.now() - self.refreshed_at >= interval
+
+
+def load_resolved_tickets(since=None):
+    """Yield (id, subject, body, ai_response) for resolved tickets, archived ones included on a full load"""
+    emails = Email.objects.filter(status='resolved').exclude(ai_response='')
+    if since is not None:
+        emails = emails.filter(resolved_at__gte=since)
+    yield from emails.values_list('id', 'subject', 'body', 'ai_response').iterator(chunk_size=2000)
+
+    if since is None:
+        for archived in ArchivedEmail.objects.filter(status='resolved').iterator(chunk_size=2000):
+            email = archived.to_email()
+            yield email.id, email.subject, email.body, email.ai_response
+
+
+_index = None
+_index_lock = threading.Lock()
+_refresh_thread = None
+
+
+def _refresh(index):
+    try:
+        index.refresh()
+    except Exception as e:
+        print(f"Ticket index refresh failed: {e}")
+    finally:
+        connections.close_all()
+
+
+def get_ticket_index(wait=False):
+    """Shared per-process index, refreshed with newly resolved tickets at most once per interval.
+
+    Loading and refreshing run on a background thread so requests never wait on
+    them; until the first load finishes the index is simply empty.
+    """
+    global _index, _refresh_thread
+    with _index_lock:
+        if _index is None:
+            _index = ResolvedTicketIndex()
+        if _index.needs_refresh() and (_refresh_thread is None or not _refresh_thread.is_alive()):
+            _refresh_thread = threading.Thread(
+                target=_refresh, args=(_index,), name='ticket-index-refresh', daemon=True
+            )
+            _refresh_thread.start()
+        thread = _refresh_thread
+    if wait and thread is not None:
+        thread.join()
+    return _index
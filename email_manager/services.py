@@ -1,8 +1,18 @@
+import os
 import re
-import openai
+import threading
+from functools import lru_cache
 from django.conf import settings
 from datetime import datetime
 
+
+def classifier_model_path():
+    """Location of the trained local classifier model on disk"""
+    return getattr(
+        settings, 'EMAIL_CLASSIFIER_PATH',
+        os.path.join(getattr(settings, 'BASE_DIR', '.'), 'email_classifier.npz')
+    )
+
 class EmailProcessor:
     def __init__(self):
         self.filter_keywords = ['support', 'query', 'request', 'help']
@@ -12,6 +22,20 @@ class EmailProcessor:
             'reset link doesn\'t work', 'charged twice', 'error', 
             'inaccessible', 'billing error'
         ]
+        self.classifier = None
+        if getattr(settings, 'EMAIL_CLASSIFIER_BACKEND', 'heuristic') == 'local':
+            self.classifier = self.load_classifier()
+    
+    def load_classifier(self):
+        """Load the trained local model, falling back to heuristics if it is missing"""
+        from .classifier import EmailClassifier
+        
+        path = classifier_model_path()
+        try:
+            return EmailClassifier.load(path)
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Local classifier unavailable ({path}): {e}")
+            return None
     
     def filter_support_emails(self, emails):
         filtered = []
@@ -55,6 +79,16 @@ class EmailProcessor:
             return 'Urgent'
         return 'Not urgent'
     
+    def classify_batch(self, emails):
+        """Return (sentiment, priority) for each email dict, batched through the local model if loaded"""
+        if self.classifier is None:
+            return [
+                (self.analyze_sentiment(email.get('body')), self.determine_priority(email.get('body')))
+                for email in emails
+            ]
+        texts = [self.classifier.email_text(email.get('subject'), email.get('body')) for email in emails]
+        return self.classifier.predict(texts)
+    
     def extract_contact_info(self, text):
         if not text:
             return ''
@@ -81,14 +115,53 @@ class EmailProcessor:
         return text[:120] + "..." if len(text) > 120 else text
 
 class AIResponder:
-    def __init__(self):
-        if settings.OPENAI_API_KEY:
+    def __init__(self, ticket_index=None):
+        self._openai = None
+        self._ticket_index = ticket_index
+    
+    @property
+    def openai(self):
+        """Import and configure the OpenAI client on first use"""
+        if self._openai is None:
+            import openai
             openai.api_key = settings.OPENAI_API_KEY
+            self._openai = openai
+        return self._openai
+    
+    def similar_tickets(self, email_obj):
+        """Resolved tickets that look like this email, best match first"""
+        if not getattr(settings, 'REPLY_RETRIEVAL_ENABLED', True):
+            return []
+        try:
+            if self._ticket_index is None:
+                from .retrieval import get_ticket_index
+                index = get_ticket_index()
+            else:
+                index = self._ticket_index
+            return index.search(
+                f"{email_obj.subject} {email_obj.body}", k=getattr(settings, 'REPLY_RETRIEVAL_TOP_K', 3)
+            )
+        except Exception as e:
+            # Retrieval is an optimisation; never let it break response generation
+            print(f"Reply retrieval unavailable: {e}")
+            return []
     
     def generate_response(self, email_obj):
+        matches = self.similar_tickets(email_obj)
+        
+        # A near-identical resolved ticket already has the answer, skip the LLM call
+        if matches and matches[0]['score'] >= getattr(settings, 'REPLY_RETRIEVAL_DIRECT_THRESHOLD', 0.9):
+            return matches[0]['ai_response']
+        
         if not settings.OPENAI_API_KEY:
             return self.generate_template_response(email_obj)
         
+        context_threshold = getattr(settings, 'REPLY_RETRIEVAL_CONTEXT_THRESHOLD', 0.3)
+        examples = "\n".join(
+            f"        Subject: {match['subject']}\n        Reply: {match['ai_response']}\n"
+            for match in matches if match['score'] >= context_threshold
+        )
+        
         prompt = f"""
         Generate a professional, empathetic customer support response to this email:
         
@@ -107,8 +180,14 @@ class AIResponder:
         - Keep response concise but complete
         """
         
+        if examples:
+            prompt += f"""
+        Replies that resolved similar past tickets (reuse what applies):
+        
+{examples}"""
+        
         try:
-            response = openai.ChatCompletion.create(
+            response = self.openai.ChatCompletion.create(
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": "You are a helpful customer support assistant."},
@@ -133,3 +212,37 @@ class AIResponder:
                 return f"Thank you for contacting us about '{email_obj.subject}'. We sincerely apologize for any inconvenience. Our team will review your case carefully and provide a resolution within 24 hours."
             else:
                 return f"Thank you for reaching out regarding '{email_obj.subject}'. We've received your message and our team will respond with the information you need within 24 hours."
+
+
+@lru_cache(maxsize=None)
+def get_email_processor():
+    """Shared EmailProcessor, built once per process"""
+    return EmailProcessor()
+
+
+@lru_cache(maxsize=None)
+def get_ai_responder():
+    """Shared AIResponder, built once per process"""
+    return AIResponder()
+
+
+def warm_reply_index():
+    """Start loading the reply-suggestion index in the background (called from wsgi/asgi).
+
+    Off unless REPLY_RETRIEVAL_WARM_ON_STARTUP is set: the index otherwise loads
+    in the background on the first reply, so workers that never generate one
+    skip numpy/scipy and the archive scan entirely.
+    """
+    if not getattr(settings, 'REPLY_RETRIEVAL_ENABLED', True):
+        return
+    if not getattr(settings, 'REPLY_RETRIEVAL_WARM_ON_STARTUP', False):
+        return
+    
+    def warm():
+        try:
+            from .retrieval import get_ticket_index
+            get_ticket_index(wait=True)
+        except Exception as e:
+            print(f"Reply retrieval unavailable: {e}")
+    
+    threading.Thread(target=warm, name='ticket-index-warm', daemon=True).start()
@@ -3,9 +3,17 @@ from . import views
 
 urlpatterns = [
     path('emails/', views.EmailListView.as_view(), name='email_list'),
+    path('emails/<int:email_id>/', views.EmailDetailView.as_view(), name='email_detail'),
     path('stats/', views.DashboardStatsView.as_view(), name='dashboard_stats'),
+    path('response-times/', views.ResponseTimeStatsView.as_view(), name='response_times'),
+    path('export/', views.ExportEmailsView.as_view(), name='export_emails'),
     path('process-sample/', views.ProcessSampleDataView.as_view(), name='process_sample'),
     path('update-status/', views.UpdateEmailStatusView.as_view(), name='update_status'),
     path('send-responses/', views.SendResponsesView.as_view(), name='send_responses'),
     path('send-single-response/', views.SendSingleResponseView.as_view(), name='send_single_response'),
+    path('async/emails/', views.AsyncEmailListView.as_view(), name='async_email_list'),
+    path('async/stats/', views.AsyncDashboardStatsView.as_view(), name='async_dashboard_stats'),
+    path('async/export/', views.AsyncExportEmailsView.as_view(), name='async_export_emails'),
+    path('async/send-responses/', views.AsyncSendResponsesView.as_view(), name='async_send_responses'),
+    path('async/send-single-response/', views.AsyncSendSingleResponseView.as_view(), name='async_send_single_response'),
 ]
@@ -1,29 +1,77 @@
-import pandas as pd
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.utils.decorators import method_decorator
 from django.views import View
-from django.db.models import Count, Q
+from django.db.models import Count, Q, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from asgiref.sync import sync_to_async
 from datetime import datetime, timedelta
-from .models import Email, EmailAnalytics
-from .services import EmailProcessor, AIResponder
+from .models import ArchivedEmail, Email, EmailAnalytics
+from .services import get_email_processor, get_ai_responder
+from .db import get_write_batcher
+from .archive import get_email
+from .scheduler import response_time_percentiles, schedule
+from .export import FORMATS, aexport_lines, aiter_emails, export_lines, iter_emails
 import json
 from .email_fetcher import EmailFetcher
 from .email_sender import EmailSender  # Add this import at the top
 
+def email_list_item(email):
+    """Serialize an email for the list endpoints, truncating the body"""
+    return {
+        'id': email.id,
+        'sender': email.sender,
+        'subject': email.subject,
+        'body': email.body[:200] + "..." if len(email.body) > 200 else email.body,
+        'sent_date': email.sent_date,
+        'sentiment': email.sentiment,
+        'priority': email.priority,
+        'contact_info': email.contact_info,
+        'request_summary': email.request_summary,
+        'ai_response': email.ai_response,
+        'status': email.status,
+        'created_at': email.created_at
+    }
+
+def urgent_email_item(email):
+    return {
+        'id': email.id,
+        'sender': email.sender,
+        'subject': email.subject,
+        'sentiment': email.sentiment,
+        'request_summary': email.request_summary
+    }
+
 class EmailListView(View):
     """API endpoint to get all emails"""
     def get(self, request):
         emails = Email.objects.all()[:50]  # Limit to 50 recent emails
         
-        email_data = []
-        for email in emails:
-            email_data.append({
+        email_data = [email_list_item(email) for email in emails]
+        
+        return JsonResponse({
+            'success': True,
+            'emails': email_data,
+            'total': Email.objects.count()
+        })
+
+class EmailDetailView(View):
+    """API endpoint to get a single email, including archived ones"""
+    def get(self, request, email_id):
+        try:
+            email = get_email(email_id)
+        except Email.DoesNotExist:
+            return JsonResponse({'success': False, 'error': 'Email not found'}, status=404)
+        
+        return JsonResponse({
+            'success': True,
+            'email': {
                 'id': email.id,
                 'sender': email.sender,
                 'subject': email.subject,
-                'body': email.body[:200] + "..." if len(email.body) > 200 else email.body,
+                'body': email.body,
                 'sent_date': email.sent_date,
                 'sentiment': email.sentiment,
                 'priority': email.priority,
@@ -32,12 +80,7 @@ class EmailListView(View):
                 'ai_response': email.ai_response,
                 'status': email.status,
                 'created_at': email.created_at
-            })
-        
-        return JsonResponse({
-            'success': True,
-            'emails': email_data,
-            'total': Email.objects.count()
+            }
         })
 
 class DashboardStatsView(View):
@@ -61,15 +104,7 @@ class DashboardStatsView(View):
         
         # Urgent emails
         urgent_emails = Email.objects.filter(priority='Urgent').order_by('-created_at')[:5]
-        urgent_data = []
-        for email in urgent_emails:
-            urgent_data.append({
-                'id': email.id,
-                'sender': email.sender,
-                'subject': email.subject,
-                'sentiment': email.sentiment,
-                'request_summary': email.request_summary
-            })
+        urgent_data = [urgent_email_item(email) for email in urgent_emails]
         
         return JsonResponse({
             'success': True,
@@ -83,6 +118,30 @@ class DashboardStatsView(View):
             }
         })
 
+class ResponseTimeStatsView(View):
+    """API endpoint for time-to-response percentiles per priority class, archived emails included"""
+    def get(self, request):
+        return JsonResponse({
+            'success': True,
+            'response_times': response_time_percentiles(Email.objects.all(), ArchivedEmail.objects.all())
+        })
+
+class ExportEmailsView(View):
+    """API endpoint to stream all emails as CSV or NDJSON (use AsyncExportEmailsView under ASGI)"""
+    def get(self, request):
+        fmt = request.GET.get('format', 'csv')
+        if fmt not in FORMATS:
+            return JsonResponse({'success': False, 'error': f'Unsupported format: {fmt}'}, status=400)
+        
+        try:
+            emails = iter_emails(request.GET, include_archived=request.GET.get('include_archived') == 'true')
+        except ValueError as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=400)
+        
+        response = StreamingHttpResponse(export_lines(emails, fmt), content_type=FORMATS[fmt])
+        response['Content-Disposition'] = f'attachment; filename="emails.{fmt}"'
+        return response
+
 @method_decorator(csrf_exempt, name='dispatch')
 class ProcessSampleDataView(View):
     """API endpoint to process sample CSV data"""
@@ -94,6 +153,8 @@ class ProcessSampleDataView(View):
                 '../68b1acd44f393_Sample_Support_Emails_Dataset.csv'
             ]
             
+            import pandas as pd
+            
             df = None
             for csv_path in csv_paths:
                 try:
@@ -108,32 +169,44 @@ class ProcessSampleDataView(View):
                     'error': 'CSV file not found. Please ensure 68b1acd44f393_Sample_Support_Emails_Dataset.csv is in the backend directory.'
                 })
             
-            # Initialize processors
-            processor = EmailProcessor()
-            ai_responder = AIResponder()
+            # Shared per-process processors
+            processor = get_email_processor()
+            ai_responder = get_ai_responder()
+            write_batcher = get_write_batcher()
             
             # Filter support emails
             emails = df.to_dict('records')
             support_emails = processor.filter_support_emails(emails)
             
-            processed_count = 0
-            for email_data in support_emails:
+            # Classify sentiment and priority in one batch
+            labels = processor.classify_batch(support_emails)
+            
+            # Generate responses for urgent/negative mail first, oldest first within a class
+            work = schedule(
+                zip(support_emails, labels),
+                priority=lambda item: item[1][1],
+                sentiment=lambda item: item[1][0],
+                received_at=lambda item: item[0]['sent_date']
+            )
+            
+            pending_writes = []
+            seen = set()
+            for email_data, (sentiment, priority) in work:
                 # Check if email already exists to avoid duplicates
-                if Email.objects.filter(
+                key = (email_data['sender'], email_data['subject'], email_data['sent_date'])
+                if key in seen or Email.objects.filter(
                     sender=email_data['sender'], 
                     subject=email_data['subject'], 
                     sent_date=email_data['sent_date']
                 ).exists():
                     continue
+                seen.add(key)
                 
                 # Process email
-                sentiment = processor.analyze_sentiment(email_data['body'])
-                priority = processor.determine_priority(email_data['body'])
                 contact_info = processor.extract_contact_info(email_data['body'])
                 request_summary = processor.summarize_request(email_data['body'])
                 
-                # Create email object
-                email_obj = Email.objects.create(
+                email_obj = Email(
                     sender=email_data['sender'],
                     subject=email_data['subject'],
                     body=email_data['body'],
@@ -145,12 +218,12 @@ class ProcessSampleDataView(View):
                     status='pending'
                 )
                 
-                # Generate AI response
-                ai_response = ai_responder.generate_response(email_obj)
-                email_obj.ai_response = ai_response
-                email_obj.save()
-                
-                processed_count += 1
+                # Generate AI response, then hand the row to the single writer
+                email_obj.ai_response = ai_responder.generate_response(email_obj)
+                pending_writes.append(write_batcher.submit(email_obj))
+            
+            # Wait for the batched inserts to commit
+            processed_count = len([future.result() for future in pending_writes])
             
             return JsonResponse({
                 'success': True,
@@ -175,6 +248,8 @@ class UpdateEmailStatusView(View):
             
             email = Email.objects.get(id=email_id)
             email.status = status
+            if status == 'responded' and email.responded_at is None:
+                email.responded_at = timezone.now()
             email.save()
             
             return JsonResponse({'success': True})
@@ -191,8 +266,8 @@ class ProcessRealEmailsView(View):
     def post(self, request):
         try:
             fetcher = EmailFetcher()
-            processor = EmailProcessor()
-            ai_responder = AIResponder()
+            processor = get_email_processor()
+            ai_responder = get_ai_responder()
             
             # Fetch real emails
             raw_emails = fetcher.connect_and_fetch(limit=20)
@@ -239,14 +314,19 @@ class SendResponsesView(View):
                     'sender': email.sender,
                     'subject': email.subject,
                     'ai_response': email.ai_response,
-                    'body': email.body
+                    'body': email.body,
+                    'priority': email.priority,
+                    'sentiment': email.sentiment,
+                    'sent_date': email.sent_date
                 })
             
             # Send responses
             results = email_sender.send_bulk_responses(email_list)
             
             # Update email status
-            Email.objects.filter(id__in=email_ids).update(status='responded')
+            Email.objects.filter(id__in=email_ids).update(
+                status='responded', responded_at=Coalesce('responded_at', Value(timezone.now())), resolved_at=None
+            )
             
             return JsonResponse({
                 'success': True,
@@ -277,6 +357,8 @@ class SendSingleResponseView(View):
             
             if success:
                 email.status = 'responded'
+                if email.responded_at is None:
+                    email.responded_at = timezone.now()
                 email.save()
                 
             return JsonResponse({
@@ -288,3 +370,134 @@ class SendSingleResponseView(View):
             return JsonResponse({'success': False, 'error': 'Email not found'})
         except Exception as e:
             return JsonResponse({'success': False, 'error': str(e)})
+
+
+
+# Async versions of the read API and send endpoints for ASGI deployments.
+# They use the async ORM, and SMTP sends run in a worker thread so the event loop is never blocked.
+
+class AsyncEmailListView(View):
+    """Async API endpoint to get all emails"""
+    async def get(self, request):
+        email_data = [email_list_item(email) async for email in Email.objects.all()[:50].aiterator()]
+        
+        return JsonResponse({
+            'success': True,
+            'emails': email_data,
+            'total': await Email.objects.acount()
+        })
+
+class AsyncDashboardStatsView(View):
+    """Async API endpoint for dashboard analytics"""
+    async def get(self, request):
+        yesterday = datetime.now() - timedelta(hours=24)
+        counts = await Email.objects.aaggregate(
+            total_emails=Count('id'),
+            emails_24h=Count('id', filter=Q(created_at__gte=yesterday))
+        )
+        
+        distributions = {}
+        for field in ('sentiment', 'priority', 'status'):
+            stats = Email.objects.order_by().values(field).annotate(count=Count(field))
+            distributions[field] = {item[field]: item['count'] async for item in stats.aiterator()}
+        
+        urgent_emails = Email.objects.filter(priority='Urgent').order_by('-created_at')[:5]
+        urgent_data = [urgent_email_item(email) async for email in urgent_emails.aiterator()]
+        
+        return JsonResponse({
+            'success': True,
+            'stats': {
+                'emails_24h': counts['emails_24h'],
+                'total_emails': counts['total_emails'],
+                'sentiment_distribution': distributions['sentiment'],
+                'priority_distribution': distributions['priority'],
+                'status_distribution': distributions['status'],
+                'urgent_emails': urgent_data
+            }
+        })
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncSendResponsesView(View):
+    """Async endpoint to send AI responses to customers"""
+    async def post(self, request):
+        try:
+            data = json.loads(request.body)
+            email_ids = data.get('email_ids', [])
+            
+            if not email_ids:
+                return JsonResponse({'success': False, 'error': 'No email IDs provided'})
+            
+            emails = Email.objects.filter(id__in=email_ids).values(
+                'sender', 'subject', 'ai_response', 'body', 'priority', 'sentiment', 'sent_date'
+            )
+            email_list = [email async for email in emails.aiterator()]
+            
+            email_sender = EmailSender()
+            results = await sync_to_async(email_sender.send_bulk_responses, thread_sensitive=False)(email_list)
+            
+            await Email.objects.filter(id__in=email_ids).aupdate(
+                status='responded', responded_at=Coalesce('responded_at', Value(timezone.now())), resolved_at=None
+            )
+            
+            return JsonResponse({
+                'success': True,
+                'results': results,
+                'message': f"Sent {results['sent']} responses successfully"
+            })
+            
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)})
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncSendSingleResponseView(View):
+    """Async endpoint to send response to single email"""
+    async def post(self, request):
+        try:
+            data = json.loads(request.body)
+            email_id = data.get('email_id')
+            
+            email = await Email.objects.aget(id=email_id)
+            email_sender = EmailSender()
+            
+            success = await sync_to_async(email_sender.send_ai_response, thread_sensitive=False)(
+                to_email=email.sender,
+                subject=email.subject,
+                response_text=email.ai_response,
+                original_body=email.body
+            )
+            
+            if success:
+                email.status = 'responded'
+                if email.responded_at is None:
+                    email.responded_at = timezone.now()
+                await email.asave()
+                
+            return JsonResponse({
+                'success': success,
+                'message': 'Response sent successfully' if success else 'Failed to send response'
+            })
+            
+        except Email.DoesNotExist:
+            return JsonResponse({'success': False, 'error': 'Email not found'})
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)})
+
+class AsyncExportEmailsView(View):
+    """Async API endpoint to stream all emails as CSV or NDJSON.
+
+    Under ASGI a sync iterator would be collected into a list before the first
+    byte is sent, so this view streams from an async generator instead.
+    """
+    async def get(self, request):
+        fmt = request.GET.get('format', 'csv')
+        if fmt not in FORMATS:
+            return JsonResponse({'success': False, 'error': f'Unsupported format: {fmt}'}, status=400)
+        
+        try:
+            emails = aiter_emails(request.GET, include_archived=request.GET.get('include_archived') == 'true')
+        except ValueError as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=400)
+        
+        response = StreamingHttpResponse(aexport_lines(emails, fmt), content_type=FORMATS[fmt])
+        response['Content-Disposition'] = f'attachment; filename="emails.{fmt}"'
+        return response